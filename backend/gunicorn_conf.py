@@ -0,0 +1,10 @@
+# Gunicorn settings for running the API with uvicorn worker processes:
+#   gunicorn -c backend/gunicorn_conf.py backend.main:app
+import os
+
+worker_class = "uvicorn_worker.UvicornWorker"
+bind = os.getenv("BIND", "0.0.0.0:8001")
+
+# product_store (captured page views) lives in process memory, so a chat only sees page views
+# recorded by the same worker. Run a single worker unless WEB_CONCURRENCY asks for more.
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
@@ -1,63 +1,193 @@
-from fastapi import FastAPI, Body, Request, Response, HTTPException, status
-from fastapi.middleware.cors import CORSMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict
-from datetime import datetime
+from fastapi import FastAPI, Request, Response, HTTPException, status
+from fastapi.exceptions import RequestValidationError
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from pydantic import BaseModel, ValidationError
+from typing import TYPE_CHECKING, Optional, Type, TypeVar
+from collections import deque
+from contextlib import aclosing, asynccontextmanager
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+import hashlib
+import logging
 import os
+import queue
+import time
+import orjson
+from cachetools import TTLCache
 from dotenv import load_dotenv
-from urllib.parse import urlparse, parse_qs, unquote_plus
-from fastapi.responses import JSONResponse
+from urllib.parse import ParseResult, urlparse, unquote_plus
+from fastapi.responses import ORJSONResponse, StreamingResponse
+
+# support importing the sibling modules both as top-level modules and as package-relative modules
+try:
+    from schemas import InitRequest, MessageRequest
+except ModuleNotFoundError as exc:
+    if exc.name != "schemas":
+        raise
+    from .schemas import InitRequest, MessageRequest
+
+if TYPE_CHECKING:
+    from openai_client import OpenAIClient
+
+logger = logging.getLogger(__name__)
+
+# While the app is running, hand this module's log records to a background thread for
+# writing, so logging from a request handler never does blocking stream I/O on the event loop.
+# Propagation is switched off for that time so no handler further up writes the same record
+# synchronously; outside lifespan (imports, tests) records go through normal propagation.
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter("%(levelname)s: %(name)s: %(message)s"))
+_log_listener = QueueListener(_log_queue, _log_handler)
+_log_queue_handler = QueueHandler(_log_queue)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    _log_listener.start()
+    logger.addHandler(_log_queue_handler)
+    propagate = logger.propagate
+    logger.propagate = False
+    try:
+        yield
+    finally:
+        logger.propagate = propagate
+        logger.removeHandler(_log_queue_handler)
+        _log_listener.stop()
 
 # Load environment variables from backend/.env so AZURE_OPENAI_* values are available
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), ".env"))
 
-app = FastAPI(title="Basalt Chatbot API", version="1.0.0")
-
-# CORS for local React dev server
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Instead of specific origins, allow all for demo purposes
-    allow_origin_regex=r"^http://localhost(:\d+)?$",
-    allow_credentials=False,
-    allow_methods=["*"],
-    allow_headers=["*"],
+app = FastAPI(
+    title="Basalt Chatbot API",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
-# Dynamic CORS middleware for demo - reflect incoming Origin
-class DynamicCORSMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        origin = request.headers.get("origin")
-
-        # Short-circuit preflight requests so they get a 200
-        if request.method == "OPTIONS":
-            response = Response(status_code=200)
-        else:
-            response: Response = await call_next(request)
+# CORS for the React dev server and product pages - reflect incoming Origin (allow all for demo purposes).
+# Written as a plain ASGI middleware (rather than BaseHTTPMiddleware) so requests are not
+# wrapped in an extra task group and response stream on their way through.
+class DynamicCORSMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # ASGI headers are already (lower-cased name, value) byte pairs
+        origin = b""
+        requested_headers = b"*"
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+            elif name == b"access-control-request-headers":
+                requested_headers = value
 
         # Only add CORS headers if an Origin header was provided
+        cors_headers = []
         if origin:
-            response.headers["Access-Control-Allow-Origin"] = origin
-            response.headers["Access-Control-Allow-Credentials"] = "true"
-            response.headers["Access-Control-Allow-Methods"] = "GET,POST,OPTIONS"
-            response.headers["Access-Control-Allow-Headers"] = (
-                request.headers.get("access-control-request-headers", "*")
-            )
-        return response
+            cors_headers = [
+                (b"access-control-allow-origin", origin),
+                (b"access-control-allow-credentials", b"true"),
+            ]
+
+        # Short-circuit preflight requests so they get a 204 without reaching the app
+        if scope["method"] == "OPTIONS":
+            headers = list(cors_headers)
+            if cors_headers:
+                # Allow-Methods/Allow-Headers only mean something on the preflight, so they are not
+                # added to actual responses. The requested headers are echoed as the raw scope bytes.
+                headers.append((b"access-control-allow-methods", b"GET,POST,OPTIONS"))
+                headers.append((b"access-control-allow-headers", requested_headers))
+                # Let browsers cache the preflight for 24h instead of repeating it before every POST,
+                # keyed on the inputs the reflected headers depend on
+                headers.append((b"access-control-max-age", b"86400"))
+                headers.append((b"vary", b"Origin, Access-Control-Request-Headers, Access-Control-Request-Method"))
+            await send({
+                "type": "http.response.start",
+                "status": 204,
+                "headers": headers,
+            })
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        # Allow-Origin differs per caller (and is absent without an Origin), so cacheable responses
+        # such as /health and /product ETags must be keyed on Origin, whether or not one was sent
+        cors_headers.append((b"vary", b"Origin"))
+
+        async def send_with_cors(message: Message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), *cors_headers]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
 
 app.add_middleware(DynamicCORSMiddleware)
 
-# In-memory store for captured product pages
-product_store: Dict[str, Dict] = {}
-
-# Helper to extract product id from a URL
-def _extract_product_id_from_url(full_url: str) -> str:
-    parsed = urlparse(full_url)
+# In-memory store for captured product pages. Bounded (LRU + TTL) because the keys come
+# straight from beacon URLs, so an unbounded dict would grow with every distinct URL seen.
+PRODUCT_STORE_MAXSIZE = int(os.getenv("PRODUCT_STORE_MAXSIZE", "10000"))
+PRODUCT_STORE_TTL_SECONDS = int(os.getenv("PRODUCT_STORE_TTL_SECONDS", "3600"))
+product_store: TTLCache = TTLCache(maxsize=PRODUCT_STORE_MAXSIZE, ttl=PRODUCT_STORE_TTL_SECONDS)
+# Bumped whenever product_store changes, so data derived from it can be cached
+_product_store_version = 0
+# Ids of the most recently captured products (oldest first), so the chat prompt can read the
+# latest few without copying the whole store
+recent_product_ids: deque = deque(maxlen=10)
+
+# Helper to extract product id from an already-parsed URL
+def _extract_product_id_from_url(parsed: ParseResult) -> str:
     path_segments = [seg for seg in parsed.path.split("/") if seg]
     if not path_segments:
         raise ValueError("Unable to extract product id from url")
     return path_segments[-1]
 
+# Helper to read one parameter from a raw query string. Returns the first value, percent-decoded
+# like parse_qs would, but scans the pairs directly instead of building a dict of every parameter.
+def _get_query_param(raw_qs: str, name: str) -> Optional[str]:
+    prefix = name + "="
+    for pair in raw_qs.split("&"):
+        if pair.startswith(prefix):
+            return unquote_plus(pair[len(prefix):])
+    return None
+
+# Capture times are stored as epoch seconds and only formatted (ISO 8601, UTC) when read
+def _format_timestamp(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+# Validate a raw JSON body straight into a schema. pydantic-core parses and validates the
+# bytes in one pass, skipping the json.loads() dict that a Body() parameter builds first.
+def _parse_body(model: Type[ModelT], raw_body: bytes) -> ModelT:
+    try:
+        return model.model_validate_json(raw_body)
+    except ValidationError as exc:
+        # Report errors the same way FastAPI does for Body() parameters (422, loc under "body")
+        raise RequestValidationError(
+            [{**err, "loc": ("body", *err["loc"])} for err in exc.errors(include_url=False)]
+        )
+
+# Routes that read the raw body have no Body() parameter for FastAPI to document, so describe
+# it through openapi_extra instead. Nested models go under components/schemas, where the
+# generated $refs point.
+_BODY_SCHEMA_DEFS: dict = {}
+
+def _json_body(model: Type[BaseModel]) -> dict:
+    schema = model.model_json_schema(ref_template="#/components/schemas/{model}")
+    _BODY_SCHEMA_DEFS.update(schema.pop("$defs", {}))
+    return {"requestBody": {"content": {"application/json": {"schema": schema}}, "required": True}}
+
+def _openapi() -> dict:
+    if app.openapi_schema is None:
+        schema = FastAPI.openapi(app)
+        schema.setdefault("components", {}).setdefault("schemas", {}).update(_BODY_SCHEMA_DEFS)
+    return app.openapi_schema
+
+app.openapi = _openapi
+
 
 @app.get("/track/pageview", status_code=status.HTTP_204_NO_CONTENT)
 async def track_pageview(request: Request):
@@ -66,245 +196,201 @@ async def track_pageview(request: Request):
     This endpoint intentionally ignores all other query parameters (e.g., Contentsquare beacons)
     and only extracts the 'url' parameter from the raw query string (percent-decoded).
     """
+    global _product_store_version
+
     # Extract the raw query string bytes and percent-decode/parse it ourselves so we
     # only pay attention to the 'url' key and ignore any other parameters.
     raw_qs = request.scope.get("query_string", b"").decode("utf-8", errors="ignore")
-    qs = parse_qs(raw_qs, keep_blank_values=True)
-    url_values = qs.get("url")
+    url_value = _get_query_param(raw_qs, "url")
 
-    if not url_values or not url_values[0]:
-        return JSONResponse(status_code=400, content={"error": "Missing 'url' query parameter."})
+    if not url_value:
+        return ORJSONResponse(status_code=400, content={"error": "Missing 'url' query parameter."})
 
-    decoded_url = unquote_plus(url_values[0])
+    decoded_url = unquote_plus(url_value)
 
     parsed = urlparse(decoded_url)
     if not parsed.scheme or not parsed.netloc:
-        return JSONResponse(status_code=400, content={"error": "Invalid 'url' parameter. Expected absolute URL."})
+        return ORJSONResponse(status_code=400, content={"error": "Invalid 'url' parameter. Expected absolute URL."})
 
     try:
-        product_id = _extract_product_id_from_url(decoded_url)
+        product_id = _extract_product_id_from_url(parsed)
     except ValueError:
-        return JSONResponse(status_code=400, content={"error": "Unable to determine product id from the provided URL."})
+        return ORJSONResponse(status_code=400, content={"error": "Unable to determine product id from the provided URL."})
 
     # Do not attempt to fetch external HTML from the provided URL (blocked by many sites).
     # Only record the URL and capture timestamp for later reference — do not store page HTML.
     product_store[product_id] = {
         "url": decoded_url,
-        "capturedAt": datetime.utcnow().isoformat() + "Z",
+        "capturedAt": time.time(),
     }
+    _product_store_version += 1
+    if product_id in recent_product_ids:
+        recent_product_ids.remove(product_id)
+    recent_product_ids.append(product_id)
 
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
 @app.get("/product/{product_id}")
-async def get_product(product_id: str):
+async def get_product(product_id: str, request: Request):
     record = product_store.get(product_id)
     if not record:
         raise HTTPException(status_code=404, detail="Product not found")
-    return record
-
-# --- Shared Schemas ---
-class Memberships(BaseModel):
-    isBetaMember: bool = False
-    isTotalTechSupport: bool = False
-
-class ClientLite(BaseModel):
-    firstName: Optional[str] = None
-    lastName: Optional[str] = None
-    email: Optional[str] = None
-    phoneNumber: Optional[str] = None
-    memberships: Memberships = Memberships()
-    membershipList: List[str] = []
-    orderId: Optional[str] = None
-
-# --- Init Schema ---
-class InitMessageClient(ClientLite):
-    emailAddress: Optional[str] = None
-    primaryPhoneNumber: Optional[str] = None
-    userPin: Optional[str] = None
-
-class InitMessage(BaseModel):
-    requestedProductDataType: Optional[str] = None
-    client: InitMessageClient
-
-class Provider(BaseModel):
-    currentProvider: str = "caip"
-    queue: Optional[str] = None
-    previousProvider: Optional[str] = None
-    channel: str = "chat"
-    pillar: Optional[str] = None
-    category: Optional[str] = None
-    chatAttributes: Optional[Dict] = None
-
-class InitRequest(BaseModel):
-    client: ClientLite
-    id: str = ""
-    message: InitMessage
-    connection: str = Field(pattern=r"^(connecting)$")
-    provider: Provider
-    requestedAgentPool: str = "caip"
-    requestedAgentQueue: Optional[str] = None
-    clientId: str
-    caipConversationId: Optional[str] = None
-    paidMember: bool = False
-    loggedInAtInitChat: bool = False
-    isNative: bool = True
-    chatSessionStart: Optional[str] = None
-    mediaTrack: str = "text"
-
-# --- Message Schema ---
-class MetadataMore(BaseModel):
-    membershipState: Optional[str] = None
-    logInState: Optional[str] = None
-    referer: Optional[str] = None
-    botSource: Optional[str] = None
-    prevUtterance: Optional[str] = None
-    requestedProductDataType: Optional[str] = None
-    existingUtterance: Optional[str] = None
-    intentName: Optional[str] = None
-    prevResponse: Optional[str] = None
-
-class Metadata(BaseModel):
-    more: MetadataMore = MetadataMore()
-    correlationId: Optional[str] = None
-    conversationId: Optional[str] = None
-    genAI: Optional[bool] = True
-
-class ChatMessage(BaseModel):
-    turnId: int
-    msgTimestamp: datetime
-    latLong: Optional[str] = None
-    metadata: Metadata = Metadata()
-    message: str
-    msgSource: str = Field(pattern=r"^(user_typed|system)$")
-
-class MessageRequest(BaseModel):
-    client: ClientLite
-    id: str
-    message: ChatMessage
-    connection: str = Field(pattern=r"^(connected)$")
-    provider: Provider
-    requestedAgentPool: str = "caip"
-    requestedAgentQueue: Optional[str] = None
-    clientId: str
-    caipConversationId: str
-    paidMember: bool = False
-    loggedInAtInitChat: bool = False
-    isNative: bool = True
-    chatSessionStart: Optional[str] = None
-    mediaTrack: str = "text"
-
-# --- Response Schemas ---
-class BotMessage(BaseModel):
-    type: str
-    displayText: Optional[str] = None
-    hyperlinks: List[str] = []
-    options: List[str] = []
-    dynamicText: Optional[List[Dict]] = None
-
-class MessageResponse(BaseModel):
-    messages: List[BotMessage]
 
-# --- API Endpoints ---
-@app.post("/services/conversation/web/api/v1/unified-chat/caip/init")
-async def init_chat(payload: InitRequest = Body(...)):
-    # Hardcoded basalt \init response for demo purposes
-    return {
-        "body": {
-            "contents": [
-                {
-                    "dataType": "text",
-                    "data": {
-                        "type": "Text",
-                        "displayText": " Hi, I'm Microsoft FDE's chatbot! What can I help you with?",
-                        "hyperlinks": [],
-                        "options": [],
-                        "dynamicText": [
-                            {
-                                "type": "DynamicText",
-                                "textData": [
-                                    {
-                                        "type": "TextOption",
-                                        "displayText": "Hi, I'm Microsoft FDE's chatbot!"
-                                    }
-                                ]
-                            },
-                            {
-                                "type": "DynamicText",
-                                "textData": [
-                                    {
-                                        "type": "TextOption",
-                                        "displayText": "What can I help you with?"
-                                    }
-                                ]
-                            }
-                        ]
-                    }
+    # Tag the serialized record so clients can revalidate with If-None-Match instead of refetching
+    body = orjson.dumps({**record, "capturedAt": _format_timestamp(record["capturedAt"])})
+    etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
+# Escaped-JSON prevResponse literals, built once rather than per request
+_INIT_PREV_RESPONSE = "[{\"type\": \"Text\", \"displayText\": \" Hi, I'm Microsoft FDE's chatbot! What can I help you with?\", \"hyperlinks\": [], \"options\": [], \"dynamicText\": [{\"type\": \"DynamicText\", \"textData\": [{\"type\": \"TextOption\", \"displayText\": \"Hi, I'm Microsoft FDE's chatbot!\"}]}, {\"type\": \"DynamicText\", \"textData\": [{\"type\": \"TextOption\", \"displayText\": \"What can I help you with?\"}]}]}]"
+_DEFAULT_PREV_RESPONSE = "[{\"type\": \"Text\", \"displayText\": \" What was that?\", \"hyperlinks\": [], \"options\": [], \"dynamicText\": [{\"type\": \"DynamicText\", \"textData\": [{\"type\": \"TextOption\", \"displayText\": \"What was that?\"}]}]}]"
+
+# escapeHatch block shared by every basalt response
+_ESCAPE_HATCH = {
+    "showEscapeHatch": True,
+    "provider": "twilio",
+    "queue": "care.postpurchasesupport.en.chat.all",
+    "pillar": "care",
+    "channel": "chat"
+}
+
+# Hardcoded basalt \init response for demo purposes; it never changes, so serialize it once
+_INIT_RESPONSE = {
+    "body": {
+        "contents": [
+            {
+                "dataType": "text",
+                "data": {
+                    "type": "Text",
+                    "displayText": " Hi, I'm Microsoft FDE's chatbot! What can I help you with?",
+                    "hyperlinks": [],
+                    "options": [],
+                    "dynamicText": [
+                        {
+                            "type": "DynamicText",
+                            "textData": [
+                                {
+                                    "type": "TextOption",
+                                    "displayText": "Hi, I'm Microsoft FDE's chatbot!"
+                                }
+                            ]
+                        },
+                        {
+                            "type": "DynamicText",
+                            "textData": [
+                                {
+                                    "type": "TextOption",
+                                    "displayText": "What can I help you with?"
+                                }
+                            ]
+                        }
+                    ]
                 }
-            ],
-            "turnId": 0,
-            "metadata": {
-                "more": {
-                    "membershipState": "No",
-                    "logInState": "loggedOut",
-                    "referer": "",
-                    "botSource": "dfcx",
-                    "prevUtterance": "Hello",
-                    "requestedProductDataType": "",
-                    "intentName": "Default Welcome Intent",
-                    "prevResponse": "[{\"type\": \"Text\", \"displayText\": \" Hi, I'm Microsoft FDE's chatbot! What can I help you with?\", \"hyperlinks\": [], \"options\": [], \"dynamicText\": [{\"type\": \"DynamicText\", \"textData\": [{\"type\": \"TextOption\", \"displayText\": \"Hi, I'm Microsoft FDE's chatbot!\"}]}, {\"type\": \"DynamicText\", \"textData\": [{\"type\": \"TextOption\", \"displayText\": \"What can I help you with?\"}]}]}]"
-                },
-                "correlationId": "a0b0654b-fab5-4a41-8e5a-df13f7b7d0dc",
-                "conversationId": "77670569-5b9e-4da2-a472-253d7dbe029e",
-                "genAI": False
             }
-        },
-        "escapeHatch": {
-            "showEscapeHatch": True,
-            "provider": "twilio",
-            "queue": "care.postpurchasesupport.en.chat.all",
-            "pillar": "care",
-            "channel": "chat"
+        ],
+        "turnId": 0,
+        "metadata": {
+            "more": {
+                "membershipState": "No",
+                "logInState": "loggedOut",
+                "referer": "",
+                "botSource": "dfcx",
+                "prevUtterance": "Hello",
+                "requestedProductDataType": "",
+                "intentName": "Default Welcome Intent",
+                "prevResponse": _INIT_PREV_RESPONSE
+            },
+            "correlationId": "a0b0654b-fab5-4a41-8e5a-df13f7b7d0dc",
+            "conversationId": "77670569-5b9e-4da2-a472-253d7dbe029e",
+            "genAI": False
         }
-    }
-
-@app.post("/services/conversation/web/api/v1/unified-chat/caip/message")
-async def send_message(payload: MessageRequest = Body(...)):
-    # Integrate with Azure OpenAI (via the lightweight wrapper in openai_client.py).
-    # If the OpenAI client isn't configured or the call fails, fall back to the original echo response.
-    user_text = payload.message.message or ""
-    display = f"ECHO1 {user_text}"
-
-    try:
+    },
+    "escapeHatch": _ESCAPE_HATCH
+}
+_INIT_RESPONSE_BYTES = orjson.dumps(_INIT_RESPONSE)
+
+# Shared OpenAI client, created on first use and reused so the SDK's HTTP connection pool
+# survives across chat turns. Importing or constructing it raises while the openai package is
+# missing or the AZURE_OPENAI_* vars are unset; callers fall back to echo and the next request
+# simply tries again.
+_openai_client: Optional["OpenAIClient"] = None
+
+def _get_openai_client() -> "OpenAIClient":
+    global _openai_client
+    if _openai_client is None:
         # support importing the wrapper both as a top-level module and as a package-relative module
         try:
             from openai_client import OpenAIClient
-        except Exception:
+        except ModuleNotFoundError as exc:
+            if exc.name != "openai_client":
+                raise
             from .openai_client import OpenAIClient
+        _openai_client = OpenAIClient()
+    return _openai_client
+
+# The formatted product history block is cached and only rebuilt when product_store changes
+# (a new capture, or entries expiring out of it).
+_product_history_cache = (-1, 0, "")
+
+def _product_history_block() -> str:
+    global _product_store_version, _product_history_cache
+    # Drop recent ids whose record has expired or been evicted, which also invalidates the block.
+    # Checked via `in` (expiry-aware on every cachetools version) rather than expire()'s return value.
+    stale_ids = [pid for pid in recent_product_ids if pid not in product_store]
+    if stale_ids:
+        for pid in stale_ids:
+            recent_product_ids.remove(pid)
+        _product_store_version += 1
+
+    version, count, block = _product_history_cache
+    if version != _product_store_version:
+        # Limit to the most recent 10 entries to avoid sending excessive data.
+        recent_items = [(pid, product_store[pid]) for pid in recent_product_ids if pid in product_store]
+        # rec currently stores only url and capturedAt (no HTML), so include those.
+        product_history = "\n".join(
+            f"ProductID={pid}; URL={rec['url']}; capturedAt={_format_timestamp(rec['capturedAt'])}"
+            for pid, rec in recent_items
+        ) or "No product history available."
+        count = len(recent_items)
+        block = f"\n\nProduct history (most recent items):\n{product_history}"
+        _product_history_cache = (_product_store_version, count, block)
+
+    # Debug: log product history state for troubleshooting (skipped entirely unless DEBUG is on)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("[product_history] count=%d", count)
+        logger.debug("[product_history] entries:%s", block)
+
+    return block
+
+# Add the recent product capture history to the user's message so the model has that context.
+def _with_product_context(user_text: str) -> str:
+    return user_text + _product_history_block()
 
-        client = OpenAIClient()
+# --- API Endpoints ---
+@app.post("/services/conversation/web/api/v1/unified-chat/caip/init", openapi_extra=_json_body(InitRequest))
+async def init_chat(request: Request):
+    # The payload is only validated; the reply is the same for every session
+    _parse_body(InitRequest, await request.body())
+    return Response(content=_INIT_RESPONSE_BYTES, media_type="application/json")
 
-        # Include recent product capture history as additional context for the model.
-        # Limit to the most recent 10 entries to avoid sending excessive data.
-        recent_items = list(product_store.items())[-10:]
-        if recent_items:
-            product_history_lines = []
-            for pid, rec in recent_items:
-                # rec currently stores only url and capturedAt (no HTML), so include those.
-                product_history_lines.append(f"ProductID={pid}; URL={rec.get('url')}; capturedAt={rec.get('capturedAt')}")
-            product_history = "\n".join(product_history_lines)
-        else:
-            product_history = "No product history available."
-
-        # Debug: print product history state for troubleshooting
-        print(f"[product_history] count={len(recent_items)}")
-        print(f"[product_history] entries:\n{product_history}")
-
-        # Add the product history to the user's message so the model has that context.
-        user_message_with_product_context = f"{user_text}\n\nProduct history (most recent items):\n{product_history}"
-
-        ai_reply = client.chat_completion(
-            user_message=user_message_with_product_context,
+@app.post("/services/conversation/web/api/v1/unified-chat/caip/message", openapi_extra=_json_body(MessageRequest))
+async def send_message(request: Request):
+    payload = _parse_body(MessageRequest, await request.body())
+
+    # Integrate with Azure OpenAI (via the lightweight wrapper in openai_client.py).
+    # If the OpenAI client isn't configured or the call fails, fall back to the original echo response.
+    message = payload.message
+    user_text = message.message or ""
+    display = f"ECHO1 {user_text}"
+
+    try:
+        client = _get_openai_client()
+        ai_reply = await client.chat_completion(
+            user_message=_with_product_context(user_text),
             system_instruction="You are a helpful assistant.",
             max_tokens=512,
             temperature=1.0,
@@ -315,10 +401,12 @@ async def send_message(payload: MessageRequest = Body(...)):
             display = ai_reply.strip()
     except Exception as ex:
         # If anything goes wrong (missing env vars, network, library), gracefully fallback to echo.
-        print(ex)
+        logger.warning("OpenAI chat completion failed, falling back to echo: %s", ex)
         display = f"ECHO2 {user_text}"
 
-    return {
+    metadata = message.metadata
+    more = metadata.more
+    return ORJSONResponse(content={
         "body": {
             "contents": [
                 {
@@ -342,33 +430,80 @@ async def send_message(payload: MessageRequest = Body(...)):
                     }
                 }
             ],
-            "turnId": payload.message.turnId,
+            "turnId": message.turnId,
             "metadata": {
                 "more": {
-                    "membershipState": payload.message.metadata.more.membershipState or "No",
-                    "logInState": payload.message.metadata.more.logInState or "loggedOut",
-                    "referer": payload.message.metadata.more.referer or "",
-                    "botSource": payload.message.metadata.more.botSource or "dfcx",
-                    "prevUtterance": payload.message.metadata.more.prevUtterance or "",
-                    "requestedProductDataType": payload.message.metadata.more.requestedProductDataType or "",
-                    "existingUtterance": payload.message.metadata.more.existingUtterance or "",
-                    "intentName": payload.message.metadata.more.intentName or "Default Welcome Intent",
-                    "prevResponse": payload.message.metadata.more.prevResponse or "[{\"type\": \"Text\", \"displayText\": \" What was that?\", \"hyperlinks\": [], \"options\": [], \"dynamicText\": [{\"type\": \"DynamicText\", \"textData\": [{\"type\": \"TextOption\", \"displayText\": \"What was that?\"}]}]}]"
+                    "membershipState": more.membershipState or "No",
+                    "logInState": more.logInState or "loggedOut",
+                    "referer": more.referer or "",
+                    "botSource": more.botSource or "dfcx",
+                    "prevUtterance": more.prevUtterance or "",
+                    "requestedProductDataType": more.requestedProductDataType or "",
+                    "existingUtterance": more.existingUtterance or "",
+                    "intentName": more.intentName or "Default Welcome Intent",
+                    "prevResponse": more.prevResponse or _DEFAULT_PREV_RESPONSE
                 },
-                "correlationId": payload.message.metadata.correlationId,
-                "conversationId": payload.message.metadata.conversationId,
+                "correlationId": metadata.correlationId,
+                "conversationId": metadata.conversationId,
                 "genAI": False
             }
         },
-        "escapeHatch": {
-            "showEscapeHatch": True,
-            "provider": "twilio",
-            "queue": "care.postpurchasesupport.en.chat.all",
-            "pillar": "care",
-            "channel": "chat"
-        }
-    }
+        "escapeHatch": _ESCAPE_HATCH
+    })
+
+# Server-sent events variant of send_message: streams the model reply as it is generated, one
+# `data: {"content": ...}` frame per chunk followed by `data: [DONE]`.
+@app.post("/services/conversation/web/api/v1/unified-chat/caip/message/stream", openapi_extra=_json_body(MessageRequest))
+async def stream_message(request: Request):
+    payload = _parse_body(MessageRequest, await request.body())
+    user_text = payload.message.message or ""
+
+    # If the client disconnects, StreamingResponse cancels this generator; aclosing() then closes
+    # the upstream OpenAI stream too (also on errors), so the model stops generating tokens.
+    async def event_stream():
+        sent_any = False
+        try:
+            client = _get_openai_client()
+            async with aclosing(client.stream_chat_completion(
+                user_message=_with_product_context(user_text),
+                system_instruction="You are a helpful assistant.",
+                max_tokens=512,
+                temperature=1.0,
+                top_p=1.0,
+            )) as chunks:
+                async for chunk in chunks:
+                    sent_any = True
+                    yield b"data: " + orjson.dumps({"content": chunk}) + b"\n\n"
+        except Exception as ex:
+            logger.warning("OpenAI streamed completion failed: %s", ex)
+            # Same echo fallback as send_message, unless part of the reply already went out
+            if not sent_any:
+                yield b"data: " + orjson.dumps({"content": f"ECHO2 {user_text}"}) + b"\n\n"
+        yield b"data: [DONE]\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+# Constant liveness reply, cacheable briefly so frequent probes can be answered upstream
+_HEALTH_BYTES = b'{"status":"ok"}'
 
 @app.get("/health")
 async def health():
-    return {"status": "ok"}
\ No newline at end of file
+    return Response(
+        content=_HEALTH_BYTES,
+        media_type="application/json",
+        headers={"Cache-Control": "public, max-age=30"},
+    )
+
+
+if __name__ == "__main__":
+    import sys
+    import uvicorn
+
+    # `python backend/main.py` serves on the uvloop event loop (not available on Windows) and the
+    # httptools parser, both installed with uvicorn[standard]. Use gunicorn_conf.py for several workers.
+    uvicorn.run(
+        app,
+        port=8001,
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+    )
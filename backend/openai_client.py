@@ -1,11 +1,11 @@
 import os
-from typing import Optional
+from typing import AsyncIterator, Optional
 
 try:
-    from openai import AzureOpenAI
+    from openai import AsyncAzureOpenAI
 except Exception:
     # Fallback for environments without the new package naming
-    from openai import OpenAI as AzureOpenAI  # type: ignore
+    from openai import AsyncOpenAI as AsyncAzureOpenAI  # type: ignore
 
 
 class OpenAIClient:
@@ -29,14 +29,14 @@ class OpenAIClient:
                 "AZURE_OPENAI_ENDPOINT, AZURE_OPENAI_KEY and AZURE_OPENAI_DEPLOYMENT must be set"
             )
 
-        # Initialize client
-        self.client = AzureOpenAI(
+        # Initialize client. It is async so awaiting a completion never blocks the event loop.
+        self.client = AsyncAzureOpenAI(
             api_version=self.api_version,
             azure_endpoint=self.endpoint,
             api_key=self.api_key,
         )
 
-    def chat_completion(
+    async def chat_completion(
         self,
         user_message: str,
         system_instruction: Optional[str] = "You are a helpful assistant.",
@@ -49,7 +49,7 @@ class OpenAIClient:
             {"role": "user", "content": user_message},
         ]
 
-        resp = self.client.chat.completions.create(
+        resp = await self.client.chat.completions.create(
             messages=messages,
             max_completion_tokens=max_tokens,
             temperature=temperature,
@@ -66,3 +66,38 @@ class OpenAIClient:
                 return resp.choices[0].text
             except Exception:
                 return ""
+
+    async def stream_chat_completion(
+        self,
+        user_message: str,
+        system_instruction: Optional[str] = "You are a helpful assistant.",
+        temperature: float = 1.0,
+        top_p: float = 1.0,
+        max_tokens: int = 512,
+    ) -> AsyncIterator[str]:
+        messages = [
+            {"role": "system", "content": system_instruction},
+            {"role": "user", "content": user_message},
+        ]
+
+        stream = await self.client.chat.completions.create(
+            messages=messages,
+            max_completion_tokens=max_tokens,
+            temperature=temperature,
+            top_p=top_p,
+            model=self.deployment,
+            stream=True,
+        )
+
+        # Yield the reply as it is generated. The upstream stream is closed whenever this
+        # generator is closed or cancelled, so an abandoned request stops consuming tokens.
+        try:
+            async for chunk in stream:
+                # Azure sends chunks without choices (e.g. content filter results); skip them
+                if not chunk.choices:
+                    continue
+                content = chunk.choices[0].delta.content
+                if content:
+                    yield content
+        finally:
+            await stream.close()
@@ -0,0 +1,119 @@
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Literal, Optional, Dict
+from datetime import datetime
+
+# --- Shared Schemas ---
+# Models used as defaults are frozen so a single shared empty instance can be handed to every
+# request via default_factory, instead of pydantic deep-copying a default instance each time.
+class Memberships(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    isBetaMember: bool = False
+    isTotalTechSupport: bool = False
+
+_EMPTY_MEMBERSHIPS = Memberships()
+
+class ClientLite(BaseModel):
+    firstName: Optional[str] = None
+    lastName: Optional[str] = None
+    email: Optional[str] = None
+    phoneNumber: Optional[str] = None
+    memberships: Memberships = Field(default_factory=lambda: _EMPTY_MEMBERSHIPS)
+    membershipList: List[str] = []
+    orderId: Optional[str] = None
+
+# --- Init Schema ---
+class InitMessageClient(ClientLite):
+    emailAddress: Optional[str] = None
+    primaryPhoneNumber: Optional[str] = None
+    userPin: Optional[str] = None
+
+class InitMessage(BaseModel):
+    requestedProductDataType: Optional[str] = None
+    client: InitMessageClient
+
+class Provider(BaseModel):
+    currentProvider: str = "caip"
+    queue: Optional[str] = None
+    previousProvider: Optional[str] = None
+    channel: str = "chat"
+    pillar: Optional[str] = None
+    category: Optional[str] = None
+    chatAttributes: Optional[Dict] = None
+
+class InitRequest(BaseModel):
+    client: ClientLite
+    id: str = ""
+    message: InitMessage
+    connection: Literal["connecting"]
+    provider: Provider
+    requestedAgentPool: str = "caip"
+    requestedAgentQueue: Optional[str] = None
+    clientId: str
+    caipConversationId: Optional[str] = None
+    paidMember: bool = False
+    loggedInAtInitChat: bool = False
+    isNative: bool = True
+    chatSessionStart: Optional[str] = None
+    mediaTrack: str = "text"
+
+# --- Message Schema ---
+class MetadataMore(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    membershipState: Optional[str] = None
+    logInState: Optional[str] = None
+    referer: Optional[str] = None
+    botSource: Optional[str] = None
+    prevUtterance: Optional[str] = None
+    requestedProductDataType: Optional[str] = None
+    existingUtterance: Optional[str] = None
+    intentName: Optional[str] = None
+    prevResponse: Optional[str] = None
+
+_EMPTY_METADATA_MORE = MetadataMore()
+
+class Metadata(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    more: MetadataMore = Field(default_factory=lambda: _EMPTY_METADATA_MORE)
+    correlationId: Optional[str] = None
+    conversationId: Optional[str] = None
+    genAI: Optional[bool] = True
+
+_EMPTY_METADATA = Metadata()
+
+class ChatMessage(BaseModel):
+    turnId: int
+    msgTimestamp: datetime
+    latLong: Optional[str] = None
+    metadata: Metadata = Field(default_factory=lambda: _EMPTY_METADATA)
+    message: str
+    msgSource: Literal["user_typed", "system"]
+
+class MessageRequest(BaseModel):
+    client: ClientLite
+    id: str
+    message: ChatMessage
+    connection: Literal["connected"]
+    provider: Provider
+    requestedAgentPool: str = "caip"
+    requestedAgentQueue: Optional[str] = None
+    clientId: str
+    caipConversationId: str
+    paidMember: bool = False
+    loggedInAtInitChat: bool = False
+    isNative: bool = True
+    chatSessionStart: Optional[str] = None
+    mediaTrack: str = "text"
+
+# --- Response Schemas ---
+class BotMessage(BaseModel):
+    type: str
+    displayText: Optional[str] = None
+    hyperlinks: List[str] = []
+    options: List[str] = []
+    dynamicText: Optional[List[Dict]] = None
+
+class MessageResponse(BaseModel):
+    messages: List[BotMessage]